@@ -109,6 +109,16 @@ else:
         }
     }
 
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    # Cache compartilhado entre os workers do gunicorn; sem ele fica o LocMem padrão (por processo).
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
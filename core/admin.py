@@ -189,14 +189,14 @@ class OrdemServicoAdmin(EmpresaAdminMixin, admin.ModelAdmin):
         ("Cliente e veiculo", {"fields": ("cliente", "veiculo", "responsavel", "executor")}),
         ("Datas", {"fields": ("entrada_em", "previsao_entrega")}),
         ("Descricao", {"fields": ("problema", "diagnostico", "observacoes")}),
-        ("Valores", {"fields": ("mao_de_obra", "desconto", "total_cache")}),
+        ("Valores", {"fields": ("mao_de_obra", "desconto", "total_cache", "total_pago_cache")}),
         ("Anexo", {"fields": ("anexo",)}),
         ("Controle", {"fields": ("criado_em", "criado_por", "iniciado_em", "finalizado_em", "finalizado_por")}),
     )
     list_display = ("id", "cliente", "veiculo", "status", "entrada_em", "empresa")
     list_filter = ("status", "empresa")
     search_fields = ("cliente__nome", "veiculo__placa")
-    readonly_fields = ("criado_em", "iniciado_em", "finalizado_em")
+    readonly_fields = ("criado_em", "iniciado_em", "finalizado_em", "total_cache", "total_pago_cache")
 
 
 @admin.register(OSItem)
@@ -206,6 +206,8 @@ class OSItemAdmin(EmpresaAdminMixin, admin.ModelAdmin):
         ("Detalhes", {"fields": ("descricao", "qtd", "valor_unitario", "subtotal")}),
     )
     list_display = ("descricao", "os", "produto", "qtd", "valor_unitario", "subtotal", "empresa")
+    # OrdemServico.__str__ usa o nome do cliente.
+    list_select_related = ("os__cliente", "produto", "empresa")
     search_fields = ("descricao", "produto__nome", "os__id")
     list_filter = ("empresa",)
     readonly_fields = ("subtotal",)
@@ -218,6 +220,7 @@ class PagamentoAdmin(EmpresaAdminMixin, admin.ModelAdmin):
         ("Dados", {"fields": ("forma_pagamento", "valor", "pago_em")}),
     )
     list_display = ("os", "forma_pagamento", "valor", "pago_em", "empresa")
+    list_select_related = ("os__cliente", "empresa")
     list_filter = ("forma_pagamento", "empresa")
     search_fields = ("os__id",)
 
@@ -236,6 +239,7 @@ class DespesaAdmin(EmpresaAdminMixin, admin.ModelAdmin):
 @admin.register(OrdemServicoLog)
 class OrdemServicoLogAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ("os", "acao", "usuario", "criado_em", "empresa")
+    list_select_related = ("os__cliente", "usuario", "empresa")
     list_filter = ("acao", "empresa")
     search_fields = ("os__id", "usuario__username")
     readonly_fields = ("empresa", "os", "usuario", "acao", "observacao", "criado_em")
@@ -1,17 +1,18 @@
 import json
 import re
+import uuid
 from datetime import date, datetime
-from decimal import Decimal
+from functools import lru_cache
 
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import AuthenticationForm
-from django.contrib.auth.models import Group
 from django.contrib.auth.password_validation import password_validators_help_texts, validate_password
+from django.core.cache import cache
 from django.core.validators import FileExtensionValidator
 from django.db import models, transaction
-from django.utils import timezone
+from django.utils import timezone, translation
 from django.utils.safestring import mark_safe
 
 from .models import (
@@ -26,12 +27,77 @@ from .models import (
     Produto,
     Veiculo,
 )
-from .permissions import ROLE_EMPLOYEE, ROLE_MANAGER
+from .permissions import get_role_groups
 from .services.resend_email import send_email_resend
 
 
 User = get_user_model()
 
+
+_NON_DIGIT_RE = re.compile(r"\D")
+# CEP, ano e documentos chegam em ASCII: tabela fixa de 128 entradas para str.translate.
+# Outros caracteres vão pelo regex, que mantém a semântica exata de \D.
+_ASCII_NON_DIGITS = {codepoint: None for codepoint in range(128) if not chr(codepoint).isdigit()}
+
+_DATE_INPUT_FORMATS = ("%d/%m/%Y", "%Y-%m-%d")
+
+
+def _vehicles_map(veiculos_qs):
+    vehicles_map = {}
+    rows = veiculos_qs.values_list("id", "cliente_id", "placa", "modelo").iterator(chunk_size=2000)
+    # Mesmo rótulo de Veiculo.__str__, sem instanciar o model por linha; iterator() evita
+    # manter todas as tuplas no cache do queryset enquanto o mapa é montado.
+    for veiculo_id, cliente_id, placa, modelo in rows:
+        vehicles_map.setdefault(cliente_id, []).append({"id": veiculo_id, "label": f"{placa} - {modelo}"})
+    return vehicles_map
+
+
+VEICULOS_MAP_CACHE_TTL = 60
+
+
+def _veiculos_versao_key(empresa_id):
+    return f"veiculos_map_versao:{empresa_id}"
+
+
+def invalidar_mapa_veiculos(empresa_id):
+    """Descarta o mapa de veículos em cache da empresa (chamado nas gravações, via core.signals)."""
+    if empresa_id:
+        cache.set(_veiculos_versao_key(empresa_id), uuid.uuid4().hex, None)
+
+
+def _vehicles_map_json(empresa):
+    """JSON {cliente_id: [{id, label}]} com os veículos da empresa, usado no formulário de OS."""
+    # Mesmo esquema de versão do dashboard: cada gravação de Veiculo troca a versão.
+    # Com o LocMem padrão a troca só vale para o worker que gravou; os demais esperam o TTL.
+    versao = cache.get_or_set(_veiculos_versao_key(empresa.pk), uuid.uuid4().hex, None)
+    key = f"veiculos_map:{empresa.pk}:{versao}"
+    data = cache.get(key)
+    if data is None:
+        data = json.dumps(_vehicles_map(Veiculo.objects.filter(empresa=empresa)))
+        cache.set(key, data, VEICULOS_MAP_CACHE_TTL)
+    return data
+
+
+@lru_cache(maxsize=8)
+def _password_help_html(language):
+    # Os validadores são fixos no processo; o idioma entra na chave porque os textos são traduzidos.
+    help_texts = password_validators_help_texts()
+    if not help_texts:
+        return ""
+    items = "".join(f"<li>{text}</li>" for text in help_texts)
+    return mark_safe(f"<ul class=\"mb-0\">{items}</ul>")
+
+
+def _has_at_least(queryset, total):
+    # LIMIT 1 OFFSET total-1: para no N-ésimo registro em vez de contar todos.
+    return total <= 0 or queryset[total - 1 : total].exists()
+
+
+def _today():
+    # timezone.localdate() exige datetime aware e falha com USE_TZ=False.
+    return timezone.localdate() if settings.USE_TZ else date.today()
+
+
 def _coerce_display_date(value):
     if not value:
         return None
@@ -45,7 +111,10 @@ def _coerce_display_date(value):
 
 
 def _digits_only(value):
-    return re.sub(r"\D", "", value or "")
+    value = value or ""
+    if value.isascii():
+        return value.translate(_ASCII_NON_DIGITS)
+    return _NON_DIGIT_RE.sub("", value)
 
 
 def _is_valid_cpf(digits):
@@ -167,18 +236,31 @@ class EmpresaFormMixin(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self._filtrar_por_empresa()
 
+    @classmethod
+    def _empresa_filter_fields(cls):
+        # Calculado uma vez por classe a partir de base_fields (guardado no __dict__
+        # da própria classe para não herdar a lista de outro formulário).
+        names = cls.__dict__.get("_EMPRESA_FILTER_FIELDS")
+        if names is None:
+            names = tuple(
+                name
+                for name, field in cls.base_fields.items()
+                if isinstance(getattr(field, "queryset", None), models.QuerySet)
+                and (name == "veiculo" or hasattr(field.queryset.model, "empresa"))
+            )
+            cls._EMPRESA_FILTER_FIELDS = names
+        return names
+
     def _filtrar_por_empresa(self):
         empresa = getattr(self.user, "empresa", None)
         if not empresa:
             return
-        for name, field in self.fields.items():
-            if hasattr(field, "queryset") and isinstance(field.queryset, models.QuerySet):
-                model = field.queryset.model
-                if hasattr(model, "empresa"):
-                    self.fields[name].queryset = field.queryset.filter(empresa=empresa)
-                if name == "veiculo":
-                    # sempre traz veículos da empresa; filtragem por cliente fica no JS
-                    self.fields[name].queryset = Veiculo.objects.filter(empresa=empresa)
+        for name in self._empresa_filter_fields():
+            if name == "veiculo":
+                # sempre traz veículos da empresa; filtragem por cliente fica no JS
+                self.fields[name].queryset = Veiculo.objects.filter(empresa=empresa)
+            else:
+                self.fields[name].queryset = self.fields[name].queryset.filter(empresa=empresa)
 
 
 class ClienteForm(EmpresaFormMixin):
@@ -224,10 +306,10 @@ class ClienteForm(EmpresaFormMixin):
         super().__init__(*args, **kwargs)
         created_at = _coerce_display_date(getattr(self.instance, "criado_em", None))
         if not created_at:
-            created_at = _coerce_display_date(timezone.now())
+            created_at = _today()
         self.initial.setdefault("data_cadastro", created_at)
         if "data_cadastro" in self.fields:
-            self.fields["data_cadastro"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.fields["data_cadastro"].input_formats = _DATE_INPUT_FORMATS
             self.fields["data_cadastro"].disabled = True
         self.order_fields(
             ["nome", "telefone", "email", "documento", "cep", "rua", "numero", "bairro", "cidade", "data_cadastro"]
@@ -319,6 +401,13 @@ class VeiculoForm(EmpresaFormMixin):
         ],
         Veiculo.Tipo.CAMINHAO: ["Volvo", "Scania", "Mercedes-Benz", "Volkswagen", "Iveco", "DAF", "MAN", "Ford"],
     }
+    # O mapa de marcas vai para a página uma única vez via json_script (core/form.html),
+    # em vez de um atributo data-brands com todas as aspas escapadas.
+    _MARCA_WIDGET_ATTRS = {
+        "list": "marca-options",
+        "placeholder": "Digite ou selecione a marca",
+        "data-placeholder": "Digite ou selecione a marca",
+    }
 
     class Meta:
         model = Veiculo
@@ -335,27 +424,16 @@ class VeiculoForm(EmpresaFormMixin):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        marcas_set = {marca for marcas in self.BRANDS_BY_TIPO.values() for marca in marcas}
         current = self.initial.get("marca") or getattr(self.instance, "marca", "") or self.data.get("marca")
-        if current:
-            marcas_set.add(current)
-        marcas = sorted(marcas_set)
-        self.fields["marca"].widget = forms.TextInput(
-            attrs={
-                "list": "marca-options",
-                "placeholder": "Digite ou selecione a marca",
-                "data-brands": json.dumps(self.BRANDS_BY_TIPO),
-                "data-placeholder": "Digite ou selecione a marca",
-            }
-        )
+        self.fields["marca"].widget.attrs.update(self._MARCA_WIDGET_ATTRS)
         # Keep current value available via datalist without enforcing choices server-side
         self.fields["marca"].initial = current or ""
 
         if self.instance and self.instance.pk:
             self.fields.pop("data_cadastro", None)
         if "data_cadastro" in self.fields:
-            self.initial.setdefault("data_cadastro", _coerce_display_date(timezone.now()))
-            self.fields["data_cadastro"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.initial.setdefault("data_cadastro", _today())
+            self.fields["data_cadastro"].input_formats = _DATE_INPUT_FORMATS
             self.fields["data_cadastro"].disabled = True
         order = ["cliente", "tipo", "marca", "modelo", "ano", "cor", "placa", "km"]
         if "data_cadastro" in self.fields:
@@ -371,7 +449,7 @@ class VeiculoForm(EmpresaFormMixin):
         if not ano:
             return ""
 
-        digits = re.sub(r"\D", "", ano)
+        digits = _digits_only(ano)
         if len(digits) == 4:
             return digits
         if len(digits) == 8:
@@ -386,19 +464,18 @@ class VeiculoForm(EmpresaFormMixin):
         modelo = (self.cleaned_data.get("modelo") or "").strip()
         if not modelo:
             return ""
-        words = [w.capitalize() for w in modelo.split()]
-        return " ".join(words)
+        # Não usar str.title(): ele capitaliza depois de dígitos/hífen ("Hb20S", "T-Cross").
+        return " ".join(map(str.capitalize, modelo.split()))
 
     def clean_cor(self):
         cor = (self.cleaned_data.get("cor") or "").strip()
         if not cor:
             return ""
-        words = [w.capitalize() for w in cor.split()]
-        return " ".join(words)
+        return " ".join(map(str.capitalize, cor.split()))
 
     def clean_cep(self):
         cep = (self.cleaned_data.get("cep") or "").strip().upper()
-        digits = re.sub(r"\D", "", cep)
+        digits = _digits_only(cep)
         if not digits:
             return ""
         if len(digits) != 8:
@@ -443,8 +520,8 @@ class ProdutoForm(EmpresaFormMixin):
         if self.instance and self.instance.pk:
             self.fields.pop("data_cadastro", None)
         if "data_cadastro" in self.fields:
-            self.initial.setdefault("data_cadastro", _coerce_display_date(timezone.now()))
-            self.fields["data_cadastro"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.initial.setdefault("data_cadastro", _today())
+            self.fields["data_cadastro"].input_formats = _DATE_INPUT_FORMATS
             self.fields["data_cadastro"].disabled = True
         order = ["nome", "descricao", "codigo", "custo", "preco", "estoque_atual", "estoque_minimo"]
         if "data_cadastro" in self.fields:
@@ -484,7 +561,7 @@ class AgendaForm(EmpresaFormMixin):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if "data_agendada" in self.fields:
-            self.fields["data_agendada"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.fields["data_agendada"].input_formats = _DATE_INPUT_FORMATS
 
     def clean(self):
         cleaned = super().clean()
@@ -556,17 +633,21 @@ class OrdemServicoForm(EmpresaFormMixin):
             responsaveis_qs = User.objects.all()
             if empresa:
                 responsaveis_qs = responsaveis_qs.filter(empresa=empresa, is_active=True)
-            is_manager = getattr(user, "is_gerente", None)
-            if callable(is_manager):
-                is_manager = is_manager()
+            # Só o model de usuário tem is_gerente(); anônimo/None nunca é gerente.
+            is_manager = isinstance(user, User) and user.is_gerente()
             if user and not is_manager:
                 responsaveis_qs = responsaveis_qs.filter(pk=user.pk)
                 self.fields["responsavel"].disabled = True
                 self.fields["responsavel"].initial = user.pk
-            self.fields["responsavel"].queryset = responsaveis_qs
+            # Usuario.__str__ usa empresa.nome: traz junto para não consultar por opção.
+            self.fields["responsavel"].queryset = responsaveis_qs.select_related("empresa").only(
+                "id", "username", "empresa__nome"
+            )
 
         if "executor" in self.fields:
-            self.fields["executor"].queryset = self.fields["executor"].queryset.filter(ativo=True)
+            self.fields["executor"].queryset = (
+                self.fields["executor"].queryset.filter(ativo=True).only("id", "nome")
+            )
             self.fields["executor"].required = True
             self.fields["executor"].error_messages["required"] = "Informe o executor do serviço."
 
@@ -576,22 +657,25 @@ class OrdemServicoForm(EmpresaFormMixin):
 
         cliente_id = self.data.get("cliente") or self.initial.get("cliente") or getattr(self.instance, "cliente_id", None)
         if cliente_id:
-            self.fields["veiculo"].queryset = veiculos_qs.filter(cliente_id=cliente_id)
+            # Só as colunas usadas no rótulo da opção (Veiculo.__str__).
+            self.fields["veiculo"].queryset = veiculos_qs.filter(cliente_id=cliente_id).only(
+                "id", "cliente_id", "placa", "modelo"
+            )
         else:
             self.fields["veiculo"].queryset = veiculos_qs.none()
 
-        vehicles_map = {}
-        for v in veiculos_qs:
-            vehicles_map.setdefault(v.cliente_id, []).append({"id": v.id, "label": str(v)})
-        self.fields["veiculo"].widget.attrs["data-vehicles"] = json.dumps(vehicles_map)
+        if empresa:
+            vehicles_json = _vehicles_map_json(empresa)
+        else:
+            vehicles_json = json.dumps(_vehicles_map(veiculos_qs))
+        self.fields["veiculo"].widget.attrs["data-vehicles"] = vehicles_json
 
         if not self.instance.pk and not self.data:
             self.initial["mao_de_obra"] = ""
 
-        date_formats = ["%d/%m/%Y", "%Y-%m-%d"]
         for name in ("entrada_em", "previsao_entrega"):
             if name in self.fields:
-                self.fields[name].input_formats = date_formats
+                self.fields[name].input_formats = _DATE_INPUT_FORMATS
 
     def clean(self):
         cleaned = super().clean()
@@ -602,7 +686,7 @@ class OrdemServicoForm(EmpresaFormMixin):
             cleaned["previsao_entrega"] = None
             return cleaned
         if not previsao_entrega:
-            previsao_entrega = timezone.now().date()
+            previsao_entrega = _today()
             cleaned["previsao_entrega"] = previsao_entrega
         if entrada_em and previsao_entrega and entrada_em > previsao_entrega:
             self.add_error(
@@ -644,7 +728,7 @@ class OSItemForm(EmpresaFormMixin):
             if estoque is None:
                 self.add_error("produto", "Defina o estoque do produto antes de lançar.")
             else:
-                if qtd % Decimal("1") != 0:
+                if qtd != qtd.to_integral_value():
                     self.add_error("qtd", "Informe quantidade inteira.")
                 elif qtd > estoque:
                     self.add_error("qtd", f"Quantidade acima do estoque disponível ({estoque}).")
@@ -652,6 +736,13 @@ class OSItemForm(EmpresaFormMixin):
 
 
 class PagamentoForm(EmpresaFormMixin):
+    # Declarado na classe para montar as opções (sem o "---------") uma única vez.
+    forma_pagamento = forms.ChoiceField(
+        label="Forma pagamento",
+        choices=Pagamento.Metodo.choices,
+        widget=forms.Select(attrs={"class": "form-control form-control-sm"}),
+    )
+
     class Meta:
         model = Pagamento
         fields = ["forma_pagamento", "valor", "pago_em"]
@@ -665,7 +756,6 @@ class PagamentoForm(EmpresaFormMixin):
                     "autocomplete": "off",
                 }
             ),
-            "forma_pagamento": forms.Select(attrs={"class": "form-control form-control-sm"}),
             "valor": forms.TextInput(
                 attrs={
                     "class": "form-control form-control-sm",
@@ -680,12 +770,10 @@ class PagamentoForm(EmpresaFormMixin):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if "forma_pagamento" in self.fields:
-            self.fields["forma_pagamento"].choices = Pagamento.Metodo.choices
         if not self.initial.get("pago_em"):
-            self.initial["pago_em"] = timezone.now().date()
+            self.initial["pago_em"] = _today()
         if "pago_em" in self.fields:
-            self.fields["pago_em"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.fields["pago_em"].input_formats = _DATE_INPUT_FORMATS
             initial = self.initial.get("pago_em")
             if isinstance(initial, (datetime, date)):
                 self.initial["pago_em"] = initial.strftime("%d/%m/%Y")
@@ -713,9 +801,9 @@ class DespesaForm(EmpresaFormMixin):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if "data" in self.fields:
-            self.fields["data"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.fields["data"].input_formats = _DATE_INPUT_FORMATS
             if not self.is_bound:
-                today = timezone.now().date()
+                today = _today()
                 formatted = today.strftime("%d/%m/%Y")
                 self.initial["data"] = formatted
                 self.fields["data"].initial = formatted
@@ -749,9 +837,9 @@ class FuncionarioForm(EmpresaFormMixin):
         super().__init__(*args, **kwargs)
         if not self.initial.get("data_ingresso"):
             ingresso = _coerce_display_date(getattr(self.instance, "data_ingresso", None))
-            self.initial["data_ingresso"] = ingresso or _coerce_display_date(timezone.now())
+            self.initial["data_ingresso"] = ingresso or _today()
         if "data_ingresso" in self.fields:
-            self.fields["data_ingresso"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.fields["data_ingresso"].input_formats = _DATE_INPUT_FORMATS
 
 
 class EmpresaUpdateForm(forms.ModelForm):
@@ -808,6 +896,41 @@ class UsuarioBaseForm(forms.ModelForm):
     )
     password1 = forms.CharField(label="Senha", widget=forms.PasswordInput, required=False)
     password2 = forms.CharField(label="Confirmar senha", widget=forms.PasswordInput, required=False)
+    is_active = forms.TypedChoiceField(
+        label="Ativo",
+        choices=(("True", "Sim"), ("False", "Não")),
+        coerce=lambda value: value == "True",
+        widget=forms.RadioSelect,
+        help_text="Se selecionar Não, o usuário não consegue acessar o sistema.",
+    )
+
+    _USER_FIELD_LABELS = {
+        "username": "Login",
+        "email": "Endereço de e-mail",
+        "email_recuperacao": "E-mail para recuperação de senha",
+        "telefone_recuperacao": "Telefone para recuperação de senha",
+    }
+    _USER_FIELD_ATTRS = {
+        "username": {
+            "placeholder": "Digite o login",
+            "autocomplete": "username",
+            "autofocus": "autofocus",
+            "class": "form-control",
+        },
+        "email": {"placeholder": "email@empresa.com", "autocomplete": "email", "class": "form-control"},
+        "email_recuperacao": {
+            "placeholder": "email@recuperacao.com",
+            "autocomplete": "email",
+            "class": "form-control",
+        },
+        "telefone_recuperacao": {"placeholder": "(99)99999-9999", "data-mask": "phone", "class": "form-control"},
+        "first_name": {"placeholder": "Nome", "autocomplete": "given-name", "class": "form-control"},
+        "last_name": {"placeholder": "Sobrenome", "autocomplete": "family-name", "class": "form-control"},
+        "password1": {"placeholder": "Crie uma senha", "autocomplete": "new-password", "class": "form-control"},
+        "password2": {"placeholder": "Confirme a senha", "autocomplete": "new-password", "class": "form-control"},
+        "is_manager": {"class": "form-check-input"},
+        "is_active": {"class": "form-check-input"},
+    }
 
     class Meta:
         model = User
@@ -828,82 +951,32 @@ class UsuarioBaseForm(forms.ModelForm):
         empresa = self._get_empresa()
         joined_at = _coerce_display_date(getattr(self.instance, "date_joined", None))
         if not joined_at:
-            joined_at = _coerce_display_date(timezone.now())
+            joined_at = _today()
         self.initial.setdefault("data_cadastro", joined_at)
         if "data_cadastro" in self.fields:
-            self.fields["data_cadastro"].input_formats = ["%d/%m/%Y", "%Y-%m-%d"]
+            self.fields["data_cadastro"].input_formats = _DATE_INPUT_FORMATS
             self.fields["data_cadastro"].disabled = True
         if "is_manager" in self.fields and getattr(empresa, "plano", None) != "PLUS":
             self.fields.pop("is_manager", None)
         if "is_active" in self.fields:
-            current = self.instance.is_active if self.instance.pk else True
-            self.fields["is_active"] = forms.TypedChoiceField(
-                label="Ativo",
-                choices=(("True", "Sim"), ("False", "Não")),
-                coerce=lambda value: value == "True",
-                widget=forms.RadioSelect,
-                initial=current,
-            )
+            self.fields["is_active"].initial = self.instance.is_active if self.instance.pk else True
         if "is_manager" in self.fields:
             self.fields["is_manager"].label = "Gerente"
             self.fields["is_manager"].help_text = (
                 "Se marcado, o usuário pode gerenciar equipe, relatórios e configurações da empresa."
             )
-        if "is_active" in self.fields:
-            self.fields["is_active"].help_text = "Se selecionar Não, o usuário não consegue acessar o sistema."
-        if "username" in self.fields:
-            self.fields["username"].label = "Login"
-            self.fields["username"].widget.attrs.setdefault("placeholder", "Digite o login")
-            self.fields["username"].widget.attrs.setdefault("autocomplete", "username")
-            self.fields["username"].widget.attrs.setdefault("autofocus", "autofocus")
-        if "email" in self.fields:
-            self.fields["email"].label = "Endereço de e-mail"
-            self.fields["email"].widget.attrs.setdefault("placeholder", "email@empresa.com")
-            self.fields["email"].widget.attrs.setdefault("autocomplete", "email")
-        if "email_recuperacao" in self.fields:
-            self.fields["email_recuperacao"].label = "E-mail para recuperação de senha"
-            self.fields["email_recuperacao"].widget.attrs.setdefault(
-                "placeholder", "email@recuperacao.com"
-            )
-            self.fields["email_recuperacao"].widget.attrs.setdefault("autocomplete", "email")
-        if "telefone_recuperacao" in self.fields:
-            self.fields["telefone_recuperacao"].label = "Telefone para recuperação de senha"
-            self.fields["telefone_recuperacao"].widget.attrs.setdefault(
-                "placeholder", "(99)99999-9999"
-            )
-            self.fields["telefone_recuperacao"].widget.attrs.setdefault("data-mask", "phone")
-        if "first_name" in self.fields:
-            self.fields["first_name"].widget.attrs.setdefault("placeholder", "Nome")
-            self.fields["first_name"].widget.attrs.setdefault("autocomplete", "given-name")
-        if "last_name" in self.fields:
-            self.fields["last_name"].widget.attrs.setdefault("placeholder", "Sobrenome")
-            self.fields["last_name"].widget.attrs.setdefault("autocomplete", "family-name")
-        if "password1" in self.fields:
-            self.fields["password1"].widget.attrs.setdefault("placeholder", "Crie uma senha")
-            self.fields["password1"].widget.attrs.setdefault("autocomplete", "new-password")
-        if "password2" in self.fields:
-            self.fields["password2"].widget.attrs.setdefault("placeholder", "Confirme a senha")
-            self.fields["password2"].widget.attrs.setdefault("autocomplete", "new-password")
-        for name in (
-            "username",
-            "email",
-            "email_recuperacao",
-            "telefone_recuperacao",
-            "first_name",
-            "last_name",
-            "password1",
-            "password2",
-        ):
+        for name, label in self._USER_FIELD_LABELS.items():
             if name in self.fields:
-                self.fields[name].widget.attrs.setdefault("class", "form-control")
-        for name in ("is_manager", "is_active"):
+                self.fields[name].label = label
+        for name, attrs in self._USER_FIELD_ATTRS.items():
             if name in self.fields:
-                self.fields[name].widget.attrs.setdefault("class", "form-check-input")
+                widget_attrs = self.fields[name].widget.attrs
+                for key, value in attrs.items():
+                    widget_attrs.setdefault(key, value)
         if "password1" in self.fields:
-            help_texts = password_validators_help_texts()
-            if help_texts:
-                items = "".join(f"<li>{text}</li>" for text in help_texts)
-                self.fields["password1"].help_text = mark_safe(f"<ul class=\"mb-0\">{items}</ul>")
+            help_html = _password_help_html(translation.get_language())
+            if help_html:
+                self.fields["password1"].help_text = help_html
 
     def _get_empresa(self):
         return getattr(self.request_user, "empresa", None)
@@ -928,9 +1001,10 @@ class UsuarioBaseForm(forms.ModelForm):
         is_active = bool(cleaned.get("is_active", False))
         is_manager = bool(cleaned.get("is_manager", False))
 
+        ativos = User.objects.filter(empresa=empresa, is_active=True)
+
         if is_active and (not self.instance.pk or not self.instance.is_active):
-            ativos = User.objects.filter(empresa=empresa, is_active=True).count()
-            if ativos >= empresa.limite_funcionarios():
+            if _has_at_least(ativos, empresa.limite_funcionarios()):
                 raise forms.ValidationError(
                     "Limite de usuarios ativos atingido. Considere o plano PLUS para aumentar o limite."
                 )
@@ -938,8 +1012,7 @@ class UsuarioBaseForm(forms.ModelForm):
         if is_active and is_manager and (
             not self.instance.pk or not self.instance.is_manager or not self.instance.is_active
         ):
-            gerentes = User.objects.filter(empresa=empresa, is_active=True, is_manager=True).count()
-            if gerentes >= empresa.limite_gerentes():
+            if _has_at_least(ativos.filter(is_manager=True), empresa.limite_gerentes()):
                 raise forms.ValidationError(
                     "Limite de gerentes atingido. Considere o plano PLUS para aumentar o limite."
                 )
@@ -964,8 +1037,7 @@ class UsuarioBaseForm(forms.ModelForm):
         return user
 
     def _sync_groups(self, user):
-        manager_group, _ = Group.objects.get_or_create(name=ROLE_MANAGER)
-        employee_group, _ = Group.objects.get_or_create(name=ROLE_EMPLOYEE)
+        manager_group, employee_group = get_role_groups()
         if "is_manager" not in self.cleaned_data:
             if not user.is_manager:
                 user.groups.add(employee_group)
@@ -976,6 +1048,7 @@ class UsuarioBaseForm(forms.ModelForm):
         else:
             user.groups.add(employee_group)
             user.groups.remove(manager_group)
+        user.__dict__.pop("_no_grupo_gerente", None)
 
     def _password_is_required(self):
         return False
@@ -1119,7 +1192,7 @@ class AutoCadastroForm(forms.Form):
 
     def clean_cep(self):
         cep = (self.cleaned_data.get("cep") or "").strip().upper()
-        digits = re.sub(r"\D", "", cep)
+        digits = _digits_only(cep)
         if not digits:
             raise forms.ValidationError("Informe o CEP.")
         if len(digits) != 8:
@@ -1152,8 +1225,7 @@ class AutoCadastroForm(forms.Form):
                 empresa=empresa,
                 is_manager=True,
             )
-            manager_group, _ = Group.objects.get_or_create(name=ROLE_MANAGER)
-            employee_group, _ = Group.objects.get_or_create(name=ROLE_EMPLOYEE)
+            manager_group, employee_group = get_role_groups()
             user.groups.add(manager_group)
             user.groups.remove(employee_group)
         return user
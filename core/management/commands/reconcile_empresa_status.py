@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Empresa
+from core.services.dashboard_metrics import invalidar_dashboard
+
+
+class Command(BaseCommand):
+    help = "Sincroniza Empresa.is_ativo com pagamento e vencimento do plano (agendar no cron, ex.: a cada hora)."
+
+    def handle(self, *args, **options):
+        ativa = Q(pagamento_confirmado=True) & ~Empresa.plano_vencido_q(timezone.now().date())
+        desativar = list(Empresa.objects.filter(is_ativo=True).exclude(ativa).values_list("pk", flat=True))
+        reativar = list(Empresa.objects.filter(ativa, is_ativo=False).values_list("pk", flat=True))
+        desativadas = Empresa.objects.filter(pk__in=desativar).update(is_ativo=False)
+        reativadas = Empresa.objects.filter(pk__in=reativar).update(is_ativo=True)
+        # update() não dispara post_save; descarta o dashboard das empresas alteradas.
+        for empresa_id in desativar + reativar:
+            invalidar_dashboard(empresa_id)
+        self.stdout.write(
+            self.style.SUCCESS(f"Empresas desativadas: {desativadas}; reativadas: {reativadas}.")
+        )
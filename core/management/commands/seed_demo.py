@@ -1,4 +1,6 @@
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 
 from core.models import Cliente, Empresa, OrdemServico, OSItem, Pagamento, Usuario, Veiculo
@@ -7,9 +9,12 @@ from core.models import Cliente, Empresa, OrdemServico, OSItem, Pagamento, Usuar
 class Command(BaseCommand):
     help = "Cria dados de demonstração (empresa, usuário admin, clientes e OS)."
 
+    # Cada registro depende da PK do anterior (e dos save() de Empresa/Cliente), então
+    # bulk_create não se aplica; uma única transação evita um commit por insert.
+    @transaction.atomic
     def handle(self, *args, **options):
         empresa, _ = Empresa.objects.get_or_create(nome="Oficina Demo", defaults={"telefone": "11999999999"})
-        user, created = Usuario.objects.get_or_create(
+        Usuario.objects.get_or_create(
             username="admin",
             defaults={
                 "email": "admin@demo.com",
@@ -17,14 +22,16 @@ class Command(BaseCommand):
                 "is_staff": True,
                 "is_superuser": True,
                 "is_manager": True,
+                "password": make_password("admin123"),
             },
         )
-        if created:
-            user.set_password("admin123")
-            user.save()
 
+        # Busca pela chave única (empresa, nome); Cliente.save() grava o nome em maiúsculas,
+        # então a busca usa a mesma forma. Telefone e e-mail só valem na primeira criação.
         cliente, _ = Cliente.objects.get_or_create(
-            empresa=empresa, nome="Cliente Demo", telefone="11988887777", email="cliente@demo.com"
+            empresa=empresa,
+            nome="CLIENTE DEMO",
+            defaults={"telefone": "11988887777", "email": "cliente@demo.com"},
         )
         veiculo, _ = Veiculo.objects.get_or_create(
             empresa=empresa,
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.http import HttpRequest
@@ -11,9 +12,15 @@ class EmpresaMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
+        # Arquivos estáticos/mídia e favicon não dependem da empresa: evita sessão e consultas.
+        self.skip_prefixes = tuple(
+            prefix for prefix in (settings.STATIC_URL, settings.MEDIA_URL, "/favicon.ico") if prefix
+        )
 
     def __call__(self, request: HttpRequest):
         request.empresa: Optional[object] = None
+        if request.path.startswith(self.skip_prefixes):
+            return self.get_response(request)
         if (
             getattr(request, "user", None)
             and request.user.is_authenticated
@@ -22,44 +29,37 @@ class EmpresaMiddleware:
         ):
             logout(request)
         if getattr(request, "user", None) and request.user.is_authenticated:
-            empresa_id = getattr(request.user, "empresa_id", None)
-            if empresa_id:
-                request.empresa = request.user.empresa.__class__.objects.filter(pk=empresa_id).first()
-            else:
-                request.empresa = None
+            # O acessor da FK consulta uma vez e fica em cache no próprio usuário.
+            request.empresa = request.user.empresa if getattr(request.user, "empresa_id", None) else None
 
+            # (plano_vencido, pagamento_confirmado, is_ativo), calculado uma vez por requisição.
+            request._empresa_status = None
             if request.empresa:
                 vencido = request.empresa.plano_vencido()
-                desired_status = (not vencido) and request.empresa.pagamento_confirmado
-                if request.empresa.is_ativo != desired_status:
-                    request.empresa.is_ativo = desired_status
-                    request.empresa.save(update_fields=["is_ativo"])
+                pago = request.empresa.pagamento_confirmado
+                # Só ajusta em memória; quem grava is_ativo é o comando reconcile_empresa_status.
+                request.empresa.is_ativo = (not vencido) and pago
+                request._empresa_status = (vencido, pago, request.empresa.is_ativo)
 
-            if (
-                request.empresa
-                and not request.empresa.pagamento_confirmado
-                and not request.user.is_superuser
-            ):
-                logout(request)
-                messages.error(
-                    request,
-                    "Cadastro recebido. Assim que o pagamento for confirmado, liberaremos o acesso ao sistema "
-                    "e enviaremos uma notificação por e-mail ou WhatsApp.",
-                )
-                return redirect("login")
-
-            if (
-                request.empresa
-                and not request.empresa.is_ativo
-                and not request.user.is_superuser
-            ):
-                if request.path.startswith("/accounts/login/") and request.method == "POST":
-                    return self.get_response(request)
-                logout(request)
-                messages.error(
-                    request,
-                    "Sua empresa está inativa. Entre em contato para regularizar.",
-                )
-                return redirect("login")
+            status = request._empresa_status
+            if status and not request.user.is_superuser:
+                _vencido, pago, ativo = status
+                if not pago:
+                    logout(request)
+                    messages.error(
+                        request,
+                        "Cadastro recebido. Assim que o pagamento for confirmado, liberaremos o acesso ao sistema "
+                        "e enviaremos uma notificação por e-mail ou WhatsApp.",
+                    )
+                    return redirect("login")
+                if not ativo:
+                    if request.path.startswith("/accounts/login/") and request.method == "POST":
+                        return self.get_response(request)
+                    logout(request)
+                    messages.error(
+                        request,
+                        "Sua empresa está inativa. Entre em contato para regularizar.",
+                    )
+                    return redirect("login")
         response = self.get_response(request)
         return response
@@ -0,0 +1,301 @@
+# Generated by Django 4.2.14 on 2026-10-15 19:50
+
+import core.models
+from django.conf import settings
+import django.contrib.auth.validators
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    replaces = [('core', '0001_initial'), ('core', '0002_alter_ordemservico_anexo_alter_usuario_groups_and_more'), ('core', '0003_alter_usuario_empresa'), ('core', '0004_alter_usuario_managers'), ('core', '0005_alter_veiculo_ano'), ('core', '0006_alter_pagamento_forma_pagamento'), ('core', '0007_cleanup_os_status_entregue'), ('core', '0008_add_cliente_endereco'), ('core', '0009_add_produto_descricao'), ('core', '0010_alter_produto_estoque_atual'), ('core', '0011_agenda'), ('core', '0012_agenda_tipo'), ('core', '0013_agenda_hora_agendada'), ('core', '0014_empresa_plano_os_audit'), ('core', '0015_add_produto_estoque_minimo'), ('core', '0016_add_empresa_logomarca'), ('core', '0017_alter_empresa_logomarca_alter_ordemservico_status'), ('core', '0018_empresa_plano_detalhes'), ('core', '0019_empresa_is_ativo'), ('core', '0020_funcionario_executor'), ('core', '0021_funcionario_data_ingresso'), ('core', '0022_remove_formapagamento'), ('core', '0023_veiculo_km'), ('core', '0024_empresa_pagamento_confirmado'), ('core', '0025_empresa_endereco'), ('core', '0026_empresa_bairro'), ('core', '0027_empresa_senha_temporaria'), ('core', '0028_usuario_email_recuperacao'), ('core', '0029_usuario_telefone_recuperacao'), ('core', '0030_empresa_renovacao_periodo'), ('core', '0031_plano_valor'), ('core', '0032_plano_valor_pix_fields')]
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Empresa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=150)),
+                ('cnpj_cpf', models.CharField(blank=True, max_length=20)),
+                ('telefone', models.CharField(blank=True, max_length=20)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('plano', models.CharField(choices=[('BASICO', 'Basico'), ('PLUS', 'Plus')], default='BASICO', max_length=10)),
+                ('logomarca', models.ImageField(blank=True, null=True, upload_to='empresas/logos/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'webp'])])),
+                ('plano_atualizado_em', models.DateTimeField(blank=True, null=True)),
+                ('plano_periodo', models.CharField(choices=[('30d', '30 dias'), ('6m', '6 meses'), ('12m', '12 meses')], default='30d', max_length=3)),
+                ('plano_vencimento_em', models.DateTimeField(blank=True, null=True)),
+                ('is_ativo', models.BooleanField(default=True)),
+                ('pagamento_confirmado', models.BooleanField(default=False)),
+                ('cep', models.CharField(blank=True, default='', max_length=12)),
+                ('rua', models.CharField(blank=True, default='', max_length=150)),
+                ('numero', models.CharField(blank=True, default='', max_length=20)),
+                ('cidade', models.CharField(blank=True, default='', max_length=100)),
+                ('bairro', models.CharField(blank=True, default='', max_length=100)),
+                ('senha_temporaria', models.CharField(blank=True, default='', max_length=128)),
+                ('renovacao_periodo', models.CharField(blank=True, choices=[('30d', '30 dias'), ('6m', '6 meses'), ('12m', '12 meses')], default='', max_length=3)),
+                ('renovacao_solicitada_em', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Cliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=150)),
+                ('telefone', models.CharField(max_length=30)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('documento', models.CharField(blank=True, max_length=30)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clientes', to='core.empresa')),
+                ('bairro', models.CharField(blank=True, default='', max_length=100)),
+                ('cep', models.CharField(blank=True, default='', max_length=12)),
+                ('cidade', models.CharField(blank=True, default='', max_length=100)),
+                ('numero', models.CharField(blank=True, default='', max_length=20)),
+                ('rua', models.CharField(blank=True, default='', max_length=150)),
+            ],
+            options={
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Produto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=150)),
+                ('codigo', models.CharField(blank=True, max_length=50)),
+                ('custo', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(0)])),
+                ('preco', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('estoque_atual', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0)])),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='produtos', to='core.empresa')),
+                ('descricao', models.TextField(blank=True)),
+                ('estoque_minimo', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+            ],
+            options={
+                'ordering': ['nome'],
+                'unique_together': {('empresa', 'nome')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Veiculo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('MOTO', 'Moto'), ('CARRO', 'Carro'), ('CAMINHAO', 'Caminhão')], max_length=10)),
+                ('placa', models.CharField(max_length=10)),
+                ('marca', models.CharField(max_length=50)),
+                ('modelo', models.CharField(max_length=50)),
+                ('ano', models.CharField(blank=True, max_length=9, null=True)),
+                ('cor', models.CharField(blank=True, max_length=30)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='veiculos', to='core.cliente')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='veiculos', to='core.empresa')),
+                ('km', models.IntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0)])),
+            ],
+            options={
+                'ordering': ['placa'],
+                'unique_together': {('empresa', 'placa')},
+            },
+        ),
+        migrations.CreateModel(
+            name='OrdemServico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('ABERTA', 'Aberta'), ('EXECUCAO', 'Em Execução'), ('AGUARDANDO_PECA', 'Aguardando Peça'), ('FINALIZADA', 'Finalizada'), ('ENTREGUE', 'Entregue'), ('CANCELADA', 'Cancelada')], default='ABERTA', max_length=20)),
+                ('entrada_em', models.DateField(default=django.utils.timezone.now)),
+                ('previsao_entrega', models.DateField(blank=True, null=True)),
+                ('problema', models.TextField()),
+                ('diagnostico', models.TextField(blank=True)),
+                ('mao_de_obra', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('desconto', models.DecimalField(decimal_places=2, default=0, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('observacoes', models.TextField(blank=True)),
+                ('anexo', models.FileField(blank=True, null=True, upload_to='anexos/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'pdf'])])),
+                ('total_cache', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ordens_servico', to='core.cliente')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ordens_servico', to='core.empresa')),
+                ('veiculo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ordens_servico', to='core.veiculo')),
+            ],
+            options={
+                'ordering': ['-entrada_em', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Despesa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('descricao', models.CharField(max_length=200)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('data', models.DateField(default=django.utils.timezone.now)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='despesas', to='core.empresa')),
+            ],
+            options={
+                'ordering': ['-data', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Usuario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('is_manager', models.BooleanField(default=False)),
+                ('empresa', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='usuarios', to='core.empresa')),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+                ('email_recuperacao', models.EmailField(blank=True, max_length=254)),
+                ('telefone_recuperacao', models.CharField(blank=True, default='', max_length=20)),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+            },
+            managers=[
+                ('objects', core.models.UsuarioManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Pagamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('pago_em', models.DateField(default=django.utils.timezone.now)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pagamentos', to='core.empresa')),
+                ('forma_pagamento', models.CharField(choices=[('Cartão de Débito', 'Cartão de Débito'), ('Cartão de Crédito', 'Cartão de Crédito'), ('Dinheiro', 'Dinheiro'), ('PIX', 'PIX'), ('Cheque', 'Cheque'), ('Outro', 'Outro')], max_length=30)),
+                ('os', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pagamentos', to='core.ordemservico')),
+            ],
+            options={
+                'ordering': ['-pago_em', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OSItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('descricao', models.CharField(max_length=255)),
+                ('qtd', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('valor_unitario', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('subtotal', models.DecimalField(blank=True, decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)])),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='os_itens', to='core.empresa')),
+                ('os', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='itens', to='core.ordemservico')),
+                ('produto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='itens', to='core.produto')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Agenda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_agendada', models.DateField()),
+                ('observacoes', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agendas', to='core.cliente')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agendas', to='core.empresa')),
+                ('veiculo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agendamentos', to='core.veiculo')),
+                ('tipo', models.CharField(choices=[('ENTREGA', 'Entrega (deixar)'), ('RETIRADA', 'Retirada (buscar)'), ('NOTA', 'Anotação')], default='NOTA', max_length=20)),
+                ('hora_agendada', models.TimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-data_agendada', '-hora_agendada', '-id'],
+                'unique_together': {('empresa', 'cliente', 'veiculo', 'data_agendada', 'hora_agendada')},
+            },
+        ),
+        migrations.AddField(
+            model_name='ordemservico',
+            name='criado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='os_criadas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='ordemservico',
+            name='finalizado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ordemservico',
+            name='finalizado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='os_finalizadas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='ordemservico',
+            name='iniciado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ordemservico',
+            name='responsavel',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='os_responsavel', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='OrdemServicoLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('acao', models.CharField(choices=[('CRIAR', 'Criar'), ('ATRIBUIR', 'Atribuir'), ('INICIAR', 'Iniciar'), ('FINALIZAR', 'Finalizar'), ('CANCELAR', 'Cancelar'), ('EDITAR', 'Editar')], max_length=30)),
+                ('observacao', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='os_logs', to='core.empresa')),
+                ('os', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='logs', to='core.ordemservico')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-criado_em', '-id'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='ordemservico',
+            name='status',
+            field=models.CharField(choices=[('ABERTA', 'Aberta'), ('EXECUCAO', 'Em Execução'), ('AGUARDANDO_PECA', 'Aguardando Peça'), ('FINALIZADA', 'Finalizada'), ('CANCELADA', 'Cancelada')], default='ABERTA', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='Funcionario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=150)),
+                ('telefone', models.CharField(blank=True, max_length=30)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('ativo', models.BooleanField(default=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funcionarios', to='core.empresa')),
+                ('data_ingresso', models.DateField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ordemservico',
+            name='executor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='os_execucoes', to='core.funcionario'),
+        ),
+        migrations.CreateModel(
+            name='PlanoValor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plano', models.CharField(choices=[('BASICO', 'Basico'), ('PLUS', 'Plus')], max_length=10)),
+                ('periodo', models.CharField(choices=[('30d', '30 dias'), ('6m', '6 meses'), ('12m', '12 meses')], max_length=3)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('pix_qr_code', models.ImageField(blank=True, null=True, upload_to='planos/qrcode/')),
+                ('pix_copia_cola', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'verbose_name': 'Valor do plano',
+                'verbose_name_plural': 'Valores do plano',
+                'ordering': ('plano', 'periodo'),
+                'unique_together': {('plano', 'periodo')},
+            },
+        ),
+    ]
@@ -11,10 +11,7 @@ def normalize_forma_pagamento(apps, schema_editor):
         "Cheque",
         "Outro",
     }
-    for pagamento in Pagamento.objects.all():
-        if pagamento.forma_pagamento not in valid:
-            pagamento.forma_pagamento = "Outro"
-            pagamento.save(update_fields=["forma_pagamento"])
+    Pagamento.objects.exclude(forma_pagamento__in=valid).update(forma_pagamento="Outro")
 
 
 class Migration(migrations.Migration):
@@ -39,5 +36,5 @@ class Migration(migrations.Migration):
                 max_length=30,
             ),
         ),
-        migrations.RunPython(normalize_forma_pagamento, migrations.RunPython.noop),
+        migrations.RunPython(normalize_forma_pagamento, migrations.RunPython.noop, elidable=True),
     ]
@@ -13,5 +13,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunPython(migrate_entregue_to_finalizada, migrations.RunPython.noop),
+        migrations.RunPython(migrate_entregue_to_finalizada, migrations.RunPython.noop, elidable=True),
     ]
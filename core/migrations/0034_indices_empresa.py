@@ -0,0 +1,56 @@
+# Generated by Django 4.2.14 on 2026-10-15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyPostgres(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY no PostgreSQL; AddIndex comum se DATABASE_URL apontar para outro banco."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY não roda dentro de transação; sem ele o CREATE INDEX bloqueia as
+    # gravações na tabela inteira (todas as empresas) enquanto o índice é montado.
+    atomic = False
+
+    dependencies = [
+        ("core", "0033_cliente_nome_unique_por_empresa"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyPostgres(
+            model_name="agenda",
+            index=models.Index(
+                fields=["empresa", "-data_agendada", "-hora_agendada"], name="agenda_empresa_data_hora_idx"
+            ),
+        ),
+        AddIndexConcurrentlyPostgres(
+            model_name="ordemservico",
+            index=models.Index(fields=["empresa", "-entrada_em"], name="os_empresa_entrada_idx"),
+        ),
+        AddIndexConcurrentlyPostgres(
+            model_name="ordemservico",
+            index=models.Index(fields=["empresa", "status", "-entrada_em"], name="os_empresa_status_entrada_idx"),
+        ),
+        AddIndexConcurrentlyPostgres(
+            model_name="pagamento",
+            index=models.Index(fields=["empresa", "-pago_em"], name="pagamento_empresa_pago_em_idx"),
+        ),
+        AddIndexConcurrentlyPostgres(
+            model_name="despesa",
+            index=models.Index(fields=["empresa", "-data"], name="despesa_empresa_data_idx"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.14 on 2026-10-15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0034_indices_empresa"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pagamento",
+            name="empresa",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="pagamentos",
+                to="core.empresa",
+            ),
+        ),
+    ]
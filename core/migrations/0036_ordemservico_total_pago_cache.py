@@ -0,0 +1,36 @@
+# Generated by Django 4.2.14 on 2026-10-15
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def preencher_totais(apps, schema_editor):
+    OrdemServico = apps.get_model("core", "OrdemServico")
+    OSItem = apps.get_model("core", "OSItem")
+    Pagamento = apps.get_model("core", "Pagamento")
+    valor = models.DecimalField(max_digits=12, decimal_places=2)
+    itens = OSItem.objects.filter(os=OuterRef("pk")).order_by().values("os").annotate(soma=Sum("subtotal")).values("soma")
+    pagos = Pagamento.objects.filter(os=OuterRef("pk")).order_by().values("os").annotate(soma=Sum("valor")).values("soma")
+    OrdemServico.objects.update(
+        total_cache=Coalesce(Subquery(itens, output_field=valor), Decimal("0.00"), output_field=valor),
+        total_pago_cache=Coalesce(Subquery(pagos, output_field=valor), Decimal("0.00"), output_field=valor),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0035_pagamento_empresa_sem_indice"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ordemservico",
+            name="total_pago_cache",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.RunPython(preencher_totais, migrations.RunPython.noop),
+    ]
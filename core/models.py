@@ -8,6 +8,8 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.validators import FileExtensionValidator, MinValueValidator
 from django.db import models
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.urls import reverse
 
@@ -35,6 +37,12 @@ class Empresa(models.Model):
         },
     }
 
+    PLANO_DIAS = {
+        PlanoPeriodo.MENSAL: 30,
+        PlanoPeriodo.SEMESTRAL: 182,
+        PlanoPeriodo.ANUAL: 365,
+    }
+
     nome = models.CharField(max_length=150)
     cnpj_cpf = models.CharField(max_length=20, blank=True)
     telefone = models.CharField(max_length=20, blank=True)
@@ -92,16 +100,28 @@ class Empresa(models.Model):
             .first()
         )
 
+    # Campos comparados em save(); guardados ao carregar do banco para evitar um SELECT extra.
+    _SNAPSHOT_FIELDS = ("plano", "plano_periodo", "plano_atualizado_em", "plano_vencimento_em", "logomarca")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(name in loaded for name in cls._SNAPSHOT_FIELDS):
+            instance._loaded_values = {name: loaded[name] for name in cls._SNAPSHOT_FIELDS}
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop("_loaded_values", None)
+
     def save(self, *args, **kwargs):
+        agora = timezone.now()
         previous = None
         if self.pk:
-            previous = Empresa.objects.filter(pk=self.pk).values(
-                "plano",
-                "plano_periodo",
-                "plano_atualizado_em",
-                "plano_vencimento_em",
-                "logomarca",
-            ).first()
+            previous = getattr(self, "_loaded_values", None)
+            if previous is None:
+                previous = Empresa.objects.filter(pk=self.pk).values(*self._SNAPSHOT_FIELDS).first()
 
         logo_changed = False
         if self.logomarca:
@@ -114,7 +134,7 @@ class Empresa(models.Model):
             self._process_logomarca()
 
         if self.plano_atualizado_em is None:
-            self.plano_atualizado_em = timezone.now()
+            self.plano_atualizado_em = agora
 
         plan_changed = False
         if previous:
@@ -124,7 +144,7 @@ class Empresa(models.Model):
             )
 
         if plan_changed:
-            self.plano_atualizado_em = timezone.now()
+            self.plano_atualizado_em = agora
 
         updated_changed = False
         if previous:
@@ -137,21 +157,15 @@ class Empresa(models.Model):
         )
 
         if should_recalc and self.plano_atualizado_em:
-            days_map = {
-                self.PlanoPeriodo.MENSAL: 30,
-                self.PlanoPeriodo.SEMESTRAL: 182,
-                self.PlanoPeriodo.ANUAL: 365,
-            }
             base_date = self.plano_atualizado_em
             if previous and (plan_changed or updated_changed):
                 prev_vencimento = previous.get("plano_vencimento_em")
-                now = timezone.now()
-                if prev_vencimento and prev_vencimento > now:
+                if prev_vencimento and prev_vencimento > agora:
                     base_date = prev_vencimento
                 else:
-                    base_date = now
+                    base_date = agora
             self.plano_vencimento_em = base_date + timedelta(
-                days=days_map.get(self.plano_periodo, 30)
+                days=self.PLANO_DIAS.get(self.plano_periodo, 30)
             )
 
         vencido = self.plano_vencido()
@@ -160,6 +174,22 @@ class Empresa(models.Model):
 
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get("update_fields")
+        current = {
+            "plano": self.plano,
+            "plano_periodo": self.plano_periodo,
+            "plano_atualizado_em": self.plano_atualizado_em,
+            "plano_vencimento_em": self.plano_vencimento_em,
+            "logomarca": self.logomarca.name or "",
+        }
+        if update_fields is None:
+            self._loaded_values = current
+        elif previous is not None:
+            self._loaded_values = {
+                name: current[name] if name in update_fields else previous[name]
+                for name in self._SNAPSHOT_FIELDS
+            }
+
     def plano_atualizado_display(self):
         return self.plano_atualizado_em or self.criado_em
 
@@ -169,12 +199,7 @@ class Empresa(models.Model):
         base = self.plano_atualizado_em or self.criado_em
         if not base:
             return None
-        days_map = {
-            self.PlanoPeriodo.MENSAL: 30,
-            self.PlanoPeriodo.SEMESTRAL: 182,
-            self.PlanoPeriodo.ANUAL: 365,
-        }
-        return base + timedelta(days=days_map.get(self.plano_periodo, 30))
+        return base + timedelta(days=self.PLANO_DIAS.get(self.plano_periodo, 30))
 
     def plano_vencido(self):
         vencimento = self.plano_vencimento_calculado()
@@ -184,6 +209,22 @@ class Empresa(models.Model):
             return vencimento.date() <= timezone.now().date()
         return vencimento.date() <= timezone.localdate()
 
+    @classmethod
+    def plano_vencido_q(cls, hoje):
+        """Equivalente em Q de plano_vencido(), para filtrar/atualizar em lote."""
+        vencido = Q(plano_vencimento_em__date__lte=hoje)
+        # Sem vencimento gravado: mesma regra de plano_vencimento_calculado().
+        sem_vencimento = Q(plano_vencimento_em__isnull=True)
+        periodos = list(cls.PLANO_DIAS)
+        for periodo, dias in [*cls.PLANO_DIAS.items(), (None, 30)]:
+            limite = hoje - timedelta(days=dias)
+            do_periodo = Q(plano_periodo=periodo) if periodo else ~Q(plano_periodo__in=periodos)
+            base_vencida = Q(plano_atualizado_em__date__lte=limite) | Q(
+                plano_atualizado_em__isnull=True, criado_em__date__lte=limite
+            )
+            vencido |= sem_vencimento & do_periodo & base_vencida
+        return vencido
+
     def dias_para_vencimento(self):
         vencimento = self.plano_vencimento_calculado()
         if not vencimento:
@@ -209,6 +250,9 @@ class Empresa(models.Model):
             return
 
         max_size = (600, 600)
+        if image_format in {"JPEG", "JPG"}:
+            # Reduz já na decodificação (shrink-on-load do libjpeg), sem carregar o raster inteiro.
+            image.draft("RGB", max_size)
         image.thumbnail(max_size)
         if image_format not in {"JPEG", "JPG", "PNG", "WEBP"}:
             image_format = "PNG"
@@ -242,11 +286,18 @@ class Empresa(models.Model):
     def logomarca_existe(self) -> bool:
         if not self.logomarca:
             return False
+        # storage.exists() pode ser uma chamada remota; guarda o resultado por nome de arquivo.
+        name = self.logomarca.name
+        cached = self.__dict__.get("_logomarca_existe_cache")
+        if cached and cached[0] == name:
+            return cached[1]
         storage = getattr(self.logomarca, "storage", None) or default_storage
         try:
-            return storage.exists(self.logomarca.name)
+            existe = storage.exists(name)
         except Exception:
-            return False
+            existe = False
+        self._logomarca_existe_cache = (name, existe)
+        return existe
 
     def logomarca_url(self) -> str:
         if not self.logomarca_existe():
@@ -299,7 +350,11 @@ class Usuario(AbstractUser):
     def is_gerente(self) -> bool:
         if self.is_superuser or self.is_manager:
             return True
-        return self.groups.filter(name="Gerente").exists()
+        # Consultado várias vezes por página (menu, templates); guarda na instância.
+        # Listagens podem pré-preencher com annotate(_no_grupo_gerente=Exists(...)).
+        if "_no_grupo_gerente" not in self.__dict__:
+            self._no_grupo_gerente = self.groups.filter(name="Gerente").exists()
+        return self._no_grupo_gerente
 
 
 class Funcionario(models.Model):
@@ -387,6 +442,9 @@ class Agenda(models.Model):
     class Meta:
         ordering = ["-data_agendada", "-hora_agendada", "-id"]
         unique_together = ("empresa", "cliente", "veiculo", "data_agendada", "hora_agendada")
+        indexes = [
+            models.Index(fields=["empresa", "-data_agendada", "-hora_agendada"], name="agenda_empresa_data_hora_idx"),
+        ]
 
     def __str__(self) -> str:
         hora = f" {self.hora_agendada.strftime('%H:%M')}" if self.hora_agendada else ""
@@ -469,17 +527,60 @@ class OrdemServico(models.Model):
         blank=True,
         validators=[FileExtensionValidator(allowed_extensions=["jpg", "jpeg", "png", "pdf"])],
     )
+    # Somas de itens e pagamentos, mantidas por core.signals; None = ainda não calculado.
     total_cache = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    total_pago_cache = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     criado_em = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-entrada_em", "-id"]
+        indexes = [
+            models.Index(fields=["empresa", "-entrada_em"], name="os_empresa_entrada_idx"),
+            models.Index(fields=["empresa", "status", "-entrada_em"], name="os_empresa_status_entrada_idx"),
+        ]
+
+    CAMPOS_CACHE = ("total_cache", "total_pago_cache")
 
     def __str__(self) -> str:
         return f"OS #{self.id} - {self.cliente.nome}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # OS nova ainda não tem itens nem pagamentos.
+            for campo in self.CAMPOS_CACHE:
+                if getattr(self, campo) is None:
+                    setattr(self, campo, Decimal("0.00"))
+        elif self.pk is not None and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            # Os caches só são gravados por atualizar_totais(); um save() comum não pode
+            # regravá-los com o valor lido antes de um item/pagamento novo. Campos adiados
+            # ficam de fora, como no save() padrão, para não serem buscados.
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.CAMPOS_CACHE and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def atualizar_totais(cls, *os_ids):
+        """Recalcula total_cache/total_pago_cache das OS informadas em um único UPDATE."""
+        valor = models.DecimalField(max_digits=12, decimal_places=2)
+        itens = (
+            OSItem.objects.filter(os=OuterRef("pk")).order_by().values("os").annotate(soma=Sum("subtotal")).values("soma")
+        )
+        pagos = (
+            Pagamento.objects.filter(os=OuterRef("pk")).order_by().values("os").annotate(soma=Sum("valor")).values("soma")
+        )
+        cls.objects.filter(pk__in=[pk for pk in os_ids if pk]).update(
+            total_cache=Coalesce(Subquery(itens, output_field=valor), Decimal("0.00"), output_field=valor),
+            total_pago_cache=Coalesce(Subquery(pagos, output_field=valor), Decimal("0.00"), output_field=valor),
+        )
+
     @property
     def total_itens(self) -> Decimal:
+        if self.total_cache is not None:
+            return self.total_cache
         return self.itens.aggregate(total=models.Sum("subtotal"))["total"] or Decimal("0.00")
 
     @property
@@ -488,6 +589,8 @@ class OrdemServico(models.Model):
 
     @property
     def total_pago(self) -> Decimal:
+        if self.total_pago_cache is not None:
+            return self.total_pago_cache
         return self.pagamentos.aggregate(total=models.Sum("valor"))["total"] or Decimal("0.00")
 
     @property
@@ -527,6 +630,17 @@ class OSItem(models.Model):
     class Meta:
         ordering = ["id"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # OS lida do banco; core.signals compara com ela para notar troca de OS sem outro SELECT.
+        instance._os_id_carregado = instance.__dict__.get("os_id")
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop("_os_id_carregado", None)
+
     def save(self, *args, **kwargs):
         self.subtotal = (self.qtd or Decimal("0")) * (self.valor_unitario or Decimal("0"))
         super().save(*args, **kwargs)
@@ -536,7 +650,8 @@ class OSItem(models.Model):
 
 
 class Pagamento(models.Model):
-    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name="pagamentos")
+    # O índice composto (empresa, -pago_em) já cobre buscas e o CASCADE por empresa.
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name="pagamentos", db_index=False)
     os = models.ForeignKey(OrdemServico, on_delete=models.CASCADE, related_name="pagamentos")
     class Metodo(models.TextChoices):
         DEBITO = "Cartão de Débito", "Cartão de Débito"
@@ -552,6 +667,20 @@ class Pagamento(models.Model):
 
     class Meta:
         ordering = ["-pago_em", "-id"]
+        indexes = [
+            models.Index(fields=["empresa", "-pago_em"], name="pagamento_empresa_pago_em_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # OS lida do banco; core.signals compara com ela para notar troca de OS sem outro SELECT.
+        instance._os_id_carregado = instance.__dict__.get("os_id")
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop("_os_id_carregado", None)
 
     def __str__(self) -> str:
         return f"Pagamento {self.valor} em {self.pago_em}"
@@ -565,6 +694,9 @@ class Despesa(models.Model):
 
     class Meta:
         ordering = ["-data", "-id"]
+        indexes = [
+            models.Index(fields=["empresa", "-data"], name="despesa_empresa_data_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.descricao
@@ -20,34 +20,38 @@ ROLE_MODELS = [
 ]
 
 
+def get_role_groups() -> tuple:
+    """(gerente, funcionário) numa consulta só; cria o grupo que ainda não existir."""
+    groups = {group.name: group for group in Group.objects.filter(name__in=(ROLE_MANAGER, ROLE_EMPLOYEE))}
+    for name in (ROLE_MANAGER, ROLE_EMPLOYEE):
+        if name not in groups:
+            groups[name], _ = Group.objects.get_or_create(name=name)
+    return groups[ROLE_MANAGER], groups[ROLE_EMPLOYEE]
+
+
 def setup_roles() -> dict:
     manager_group, _ = Group.objects.get_or_create(name=ROLE_MANAGER)
     employee_group, _ = Group.objects.get_or_create(name=ROLE_EMPLOYEE)
 
-    manager_permissions = []
-    employee_permissions = []
-
-    for model_path in ROLE_MODELS:
-        model = apps.get_model(model_path)
-        content_type = ContentType.objects.get_for_model(model)
+    # Uma consulta para todas as permissões; add() só insere as que faltam, então
+    # rodar de novo (ex.: a cada deploy) é praticamente um no-op.
+    role_models = [apps.get_model(model_path) for model_path in ROLE_MODELS]
+    content_types = ContentType.objects.get_for_models(*role_models)
+    manager_codenames = set()
+    employee_codenames = set()
+    for model in role_models:
         model_name = model._meta.model_name
-        manager_codenames = [
-            f"view_{model_name}",
-            f"add_{model_name}",
-            f"change_{model_name}",
-            f"delete_{model_name}",
-        ]
-        employee_codenames = [
-            f"view_{model_name}",
-            f"add_{model_name}",
-            f"change_{model_name}",
-        ]
-        manager_permissions += list(
-            Permission.objects.filter(content_type=content_type, codename__in=manager_codenames)
-        )
-        employee_permissions += list(
-            Permission.objects.filter(content_type=content_type, codename__in=employee_codenames)
+        employee_codenames.update(f"{action}_{model_name}" for action in ("view", "add", "change"))
+        manager_codenames.update(f"{action}_{model_name}" for action in ("view", "add", "change", "delete"))
+
+    manager_permissions = list(
+        Permission.objects.filter(
+            content_type__in=content_types.values(), codename__in=manager_codenames
         )
+    )
+    employee_permissions = [
+        permission for permission in manager_permissions if permission.codename in employee_codenames
+    ]
 
     manager_group.permissions.add(*manager_permissions)
     employee_group.permissions.add(*employee_permissions)
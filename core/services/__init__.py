@@ -11,7 +11,10 @@ def is_manager_user(user) -> bool:
 
 
 def os_queryset_for_user(user, qs=None):
-    qs = qs or OrdemServico.objects.all()
+    # "qs or ..." avaliaria o queryset recebido (e trocaria um resultado vazio por todas as OS).
+    # Relações reversas (itens, pagamentos) ficam a cargo do chamador via prefetch_related.
+    if qs is None:
+        qs = OrdemServico.objects.select_related("cliente", "veiculo", "responsavel", "executor")
     empresa = getattr(user, "empresa", None)
     if empresa:
         qs = qs.filter(empresa=empresa)
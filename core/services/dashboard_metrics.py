@@ -1,7 +1,10 @@
 import calendar
+import uuid
 from datetime import timedelta
 
-from django.db.models import Avg, Count, F, Q, Sum, OuterRef, Subquery
+from django.core.cache import cache
+
+from django.db.models import Avg, Count, F, Q, Sum, OuterRef, Subquery, Window
 from django.db.models.expressions import ExpressionWrapper
 from django.db.models.fields import DateTimeField, DurationField
 from django.db.models.functions import Cast, Coalesce, TruncDate, TruncMonth
@@ -99,6 +102,19 @@ def _merge_monthly(entradas, saidas):
     return items
 
 
+DASHBOARD_CACHE_TTL = 60
+
+
+def _dashboard_versao_key(empresa_id):
+    return f"dashboard_versao:{empresa_id}"
+
+
+def invalidar_dashboard(empresa_id):
+    """Descarta os dados de dashboard em cache da empresa (chamado nas gravações, via core.signals)."""
+    if empresa_id:
+        cache.set(_dashboard_versao_key(empresa_id), uuid.uuid4().hex, None)
+
+
 def build_dashboard_data(
     user,
     range_key=None,
@@ -116,6 +132,28 @@ def build_dashboard_data(
     recorrencia_limit = _coerce_limit(recorrencia_limit, 10)
     produtos_limit = _coerce_limit(produtos_limit, 10)
     period_start, period_end = _resolve_period(range_key, start, end, default_months=6)
+
+    # A versão muda a cada gravação relevante da empresa. A invalidação só alcança todos os
+    # workers com cache compartilhado (REDIS_URL); no LocMem padrão cada worker tem o seu e
+    # os outros podem servir o valor anterior por até DASHBOARD_CACHE_TTL segundos.
+    versao = cache.get_or_set(_dashboard_versao_key(empresa.pk), uuid.uuid4().hex, None)
+    escopo = "gerente" if is_manager_user(user) else f"usuario:{user.pk}"
+    key = (
+        f"dashboard:{empresa.pk}:{versao}:{escopo}:{period_start.isoformat()}:{period_end.isoformat()}:"
+        f"{clientes_limit}:{recorrencia_limit}:{produtos_limit}"
+    )
+    data = cache.get(key)
+    if data is None:
+        data = _calcular_dashboard_data(
+            user, empresa, period_start, period_end, clientes_limit, recorrencia_limit, produtos_limit
+        )
+        cache.set(key, data, DASHBOARD_CACHE_TTL)
+    return data
+
+
+def _calcular_dashboard_data(
+    user, empresa, period_start, period_end, clientes_limit, recorrencia_limit, produtos_limit
+):
     op_start, op_end = period_start, period_end
 
     os_qs = os_queryset_for_user(user)
@@ -145,12 +183,17 @@ def build_dashboard_data(
     )
     lucro_mensal = _merge_monthly(entradas, saidas)
 
-    saldo_periodo = (pagamentos_periodo.aggregate(total=Sum("valor"))["total"] or 0) - (
-        despesas_periodo.aggregate(total=Sum("valor"))["total"] or 0
+    # Total geral e do período em uma única consulta por tabela.
+    entradas_totais = pagamentos_qs.aggregate(
+        geral=Sum("valor"),
+        periodo=Sum("valor", filter=Q(pago_em__gte=period_start, pago_em__lte=period_end)),
     )
-    saldo_geral = (pagamentos_qs.aggregate(total=Sum("valor"))["total"] or 0) - (
-        despesas_qs.aggregate(total=Sum("valor"))["total"] or 0
+    saidas_totais = despesas_qs.aggregate(
+        geral=Sum("valor"),
+        periodo=Sum("valor", filter=Q(data__gte=period_start, data__lte=period_end)),
     )
+    saldo_periodo = (entradas_totais["periodo"] or 0) - (saidas_totais["periodo"] or 0)
+    saldo_geral = (entradas_totais["geral"] or 0) - (saidas_totais["geral"] or 0)
 
     os_periodo = os_qs.filter(entrada_em__gte=period_start, entrada_em__lte=period_end)
     os_por_funcionario = (
@@ -212,11 +255,17 @@ def build_dashboard_data(
         .order_by("-total")[:produtos_limit]
     )
 
-    estoque_critico = produtos_qs.filter(
-        estoque_atual__isnull=False,
-        estoque_minimo__isnull=False,
-        estoque_atual__lte=F("estoque_minimo"),
-    ).order_by("estoque_atual", "nome")
+    # Total via janela para trazer contagem e os 10 primeiros na mesma consulta.
+    estoque_critico = list(
+        produtos_qs.filter(
+            estoque_atual__isnull=False,
+            estoque_minimo__isnull=False,
+            estoque_atual__lte=F("estoque_minimo"),
+        )
+        .annotate(total_critico=Window(Count("id")))
+        .order_by("estoque_atual", "nome")
+        .only("nome", "estoque_atual", "estoque_minimo")[:10]
+    )
 
     clientes_top = (
         pagamentos_periodo.values("os__cliente__nome")
@@ -281,14 +330,14 @@ def build_dashboard_data(
                 "total": [float(row["total"] or 0) for row in produtos_top],
             },
             "estoque_critico": {
-                "total": estoque_critico.count(),
+                "total": estoque_critico[0].total_critico if estoque_critico else 0,
                 "itens": [
                     {
                         "nome": produto.nome,
                         "estoque_atual": produto.estoque_atual,
                         "estoque_minimo": produto.estoque_minimo,
                     }
-                    for produto in estoque_critico[:10]
+                    for produto in estoque_critico
                 ],
             },
         },
@@ -0,0 +1,80 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    Cliente,
+    Despesa,
+    Empresa,
+    Funcionario,
+    OrdemServico,
+    OrdemServicoLog,
+    OSItem,
+    Pagamento,
+    Produto,
+    Usuario,
+    Veiculo,
+)
+from .forms import invalidar_mapa_veiculos
+from .services.dashboard_metrics import invalidar_dashboard
+
+
+@receiver(pre_save, sender=OSItem)
+@receiver(pre_save, sender=Pagamento)
+def guardar_os_anterior(sender, instance, **kwargs):
+    # Itens/pagamentos só são editados pelo admin; se mudarem de OS, a antiga também é recalculada.
+    instance._os_id_anterior = None
+    if not instance.pk or kwargs.get("raw"):
+        return
+    carregado = instance.__dict__.get("_os_id_carregado")
+    if carregado is None:
+        # Instância montada à mão ou com os_id adiado: consulta o valor gravado.
+        carregado = sender.objects.filter(pk=instance.pk).values_list("os_id", flat=True).first()
+    if carregado != instance.os_id:
+        instance._os_id_anterior = carregado
+
+
+@receiver(post_save, sender=OSItem)
+@receiver(post_save, sender=Pagamento)
+@receiver(post_delete, sender=OSItem)
+@receiver(post_delete, sender=Pagamento)
+def atualizar_totais_da_os(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    OrdemServico.atualizar_totais(instance.os_id, getattr(instance, "_os_id_anterior", None))
+    # O UPDATE dos totais não dispara post_save da OS; invalida o dashboard aqui mesmo.
+    invalidar_dashboard(instance.empresa_id)
+    instance._os_id_carregado = instance.os_id
+    # A OS já carregada na instância passa a recalcular na próxima leitura.
+    if sender.os.is_cached(instance):
+        for campo in OrdemServico.CAMPOS_CACHE:
+            setattr(instance.os, campo, None)
+
+
+DASHBOARD_MODELS = (
+    Cliente,
+    Despesa,
+    Funcionario,
+    OrdemServico,
+    OrdemServicoLog,
+    OSItem,
+    Pagamento,
+    Produto,
+    Usuario,
+    Veiculo,
+)
+
+
+def invalidar_dashboard_da_empresa(sender, instance, **kwargs):
+    invalidar_dashboard(instance.pk if sender is Empresa else instance.empresa_id)
+
+
+for _model in (Empresa, *DASHBOARD_MODELS):
+    post_save.connect(invalidar_dashboard_da_empresa, sender=_model, dispatch_uid=f"dashboard_{_model.__name__}")
+for _model in DASHBOARD_MODELS:
+    post_delete.connect(invalidar_dashboard_da_empresa, sender=_model, dispatch_uid=f"dashboard_del_{_model.__name__}")
+
+
+@receiver(post_save, sender=Veiculo)
+@receiver(post_delete, sender=Veiculo)
+def invalidar_mapa_veiculos_da_empresa(sender, instance, **kwargs):
+    invalidar_mapa_veiculos(instance.empresa_id)
@@ -1,13 +1,26 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.db import IntegrityError
-from django.test import TestCase
+from django.db.models import Exists, OuterRef
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from .forms import ClienteForm
-from .models import Cliente, Despesa, Empresa, OrdemServico, OSItem, Pagamento, Veiculo
-from .permissions import ROLE_EMPLOYEE, ROLE_MANAGER, setup_roles
+from .forms import ClienteForm, OrdemServicoForm, VeiculoForm, _digits_only
+from .models import Cliente, Despesa, Empresa, OrdemServico, OSItem, Pagamento, Produto, Veiculo
+from .permissions import ROLE_EMPLOYEE, ROLE_MANAGER, get_role_groups, setup_roles
+from .services import os_queryset_for_user
+from .services.dashboard_metrics import build_dashboard_data
 
 
 User = get_user_model()
@@ -67,6 +80,12 @@ class EmpresaIsolationTest(TestCase):
         self.assertContains(response, f"<td>{self.os2.id}</td>")
         self.assertNotContains(response, f"<td>{self.os1.id}</td>")
 
+    def test_os_queryset_for_user_nao_avalia_queryset_recebido(self):
+        self.user1.is_gerente()
+        with self.assertNumQueries(0):
+            qs = os_queryset_for_user(self.user1, OrdemServico.objects.filter(pk=self.os2.pk))
+        self.assertEqual(list(qs), [])
+
     def test_calcula_saldo(self):
         OSItem.objects.create(
             empresa=self.empresa1, os=self.os1, descricao="Item", qtd=1, valor_unitario=100, subtotal=100
@@ -78,6 +97,55 @@ class EmpresaIsolationTest(TestCase):
         self.assertEqual(self.os1.total_pago, 60)
         self.assertEqual(self.os1.saldo, 40)
 
+    def test_lista_de_os_nao_agrega_totais_por_linha(self):
+        with self.assertNumQueries(1):
+            ordens = list(OrdemServico.objects.filter(empresa=self.empresa1))
+            self.assertEqual([ordem.saldo for ordem in ordens], [0])
+
+    def test_salvar_os_com_campos_adiados_nao_busca_colunas_adiadas(self):
+        ordem = OrdemServico.objects.defer("problema", "diagnostico", "observacoes", "anexo").get(pk=self.os1.pk)
+        ordem.status = OrdemServico.Status.EXECUCAO
+        # Só o UPDATE das colunas carregadas, sem os caches de totais.
+        with self.assertNumQueries(1):
+            ordem.save()
+        ordem.refresh_from_db()
+        self.assertEqual(ordem.status, OrdemServico.Status.EXECUCAO)
+        self.assertEqual(ordem.problema, "Teste")
+
+    def test_totais_da_os_ficam_em_cache(self):
+        os_antiga = OrdemServico.objects.get(pk=self.os1.pk)
+        item = OSItem.objects.create(empresa=self.empresa1, os=self.os1, descricao="Item", qtd=2, valor_unitario=50)
+        Pagamento.objects.create(empresa=self.empresa1, os=self.os1, valor=30, forma_pagamento=Pagamento.Metodo.PIX)
+
+        os_antiga.diagnostico = "Revisado"
+        os_antiga.save()
+
+        ordem = OrdemServico.objects.get(pk=self.os1.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(ordem.total_itens, 100)
+            self.assertEqual(ordem.total_pago, 30)
+            self.assertEqual(ordem.saldo, 70)
+
+        item.delete()
+        ordem.refresh_from_db()
+        self.assertEqual(ordem.total_cache, 0)
+        self.assertEqual(ordem.diagnostico, "Revisado")
+
+    def test_item_carregado_troca_de_os_sem_select_extra(self):
+        outra = OrdemServico.objects.create(
+            empresa=self.empresa1, cliente=self.os1.cliente, veiculo=self.os1.veiculo, problema="Outra"
+        )
+        OSItem.objects.create(empresa=self.empresa1, os=self.os1, descricao="Item", qtd=1, valor_unitario=40)
+        item = OSItem.objects.get(os=self.os1)
+        item.qtd = 2
+        # UPDATE do item + recálculo dos totais; a OS anterior vem do valor carregado.
+        with self.assertNumQueries(2):
+            item.save()
+        item.os = outra
+        item.save()
+        self.assertEqual(OrdemServico.objects.get(pk=self.os1.pk).total_cache, 0)
+        self.assertEqual(OrdemServico.objects.get(pk=outra.pk).total_cache, 80)
+
 
 class UserManagementTests(TestCase):
     def setUp(self):
@@ -92,6 +160,13 @@ class UserManagementTests(TestCase):
         funcionario_group = Group.objects.get(name=ROLE_EMPLOYEE)
         self.employee.groups.add(funcionario_group)
 
+    def test_grupos_de_papel_numa_consulta(self):
+        with self.assertNumQueries(1):
+            gerente, funcionario = get_role_groups()
+        self.assertEqual((gerente.name, funcionario.name), (ROLE_MANAGER, ROLE_EMPLOYEE))
+        funcionario.delete()
+        self.assertEqual(get_role_groups()[1].name, ROLE_EMPLOYEE)
+
     def test_manager_cria_usuario_ate_limite(self):
         self.client.force_login(self.manager)
         url = reverse("usuarios_create")
@@ -124,6 +199,17 @@ class UserManagementTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Limite de usuarios ativos atingido")
 
+    def test_is_gerente_consulta_grupos_uma_vez(self):
+        employee = User.objects.get(pk=self.employee.pk)
+        with self.assertNumQueries(1):
+            self.assertFalse(employee.is_gerente())
+            self.assertFalse(employee.is_gerente())
+        anotado = User.objects.annotate(
+            _no_grupo_gerente=Exists(Group.objects.filter(user=OuterRef("pk"), name=ROLE_MANAGER))
+        ).get(pk=self.employee.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(anotado.is_gerente())
+
     def test_funcionario_recebe_403_em_usuarios(self):
         self.client.force_login(self.employee)
         response = self.client.get(reverse("usuarios_list"))
@@ -252,6 +338,38 @@ class DashboardDataTests(TestCase):
         self.assertEqual(sum(data["operacional"]["os_por_funcionario"]["valores"]), 2)
         self.assertEqual(data["financeiro"]["saldo_geral"], 250.0)
 
+    def test_dashboard_data_estoque_critico_total_e_itens(self):
+        Produto.objects.bulk_create(
+            Produto(empresa=self.empresa1, nome=f"Peca {i:02d}", preco=10, estoque_atual=i, estoque_minimo=20)
+            for i in range(12)
+        )
+        self.client.force_login(self.manager)
+        data = self.client.get(reverse("dashboard_data"), {"range": "30d"}).json()
+        critico = data["produtos"]["estoque_critico"]
+        self.assertEqual(critico["total"], 12)
+        self.assertEqual([item["nome"] for item in critico["itens"]], [f"Peca {i:02d}" for i in range(10)])
+
+    def test_dashboard_data_em_cache_ate_nova_gravacao(self):
+        primeiro = build_dashboard_data(self.manager, range_key="30d")
+        with self.assertNumQueries(0):
+            self.assertEqual(build_dashboard_data(self.manager, range_key="30d"), primeiro)
+        Despesa.objects.create(empresa=self.empresa1, descricao="Aluguel", valor=100)
+        atualizado = build_dashboard_data(self.manager, range_key="30d")
+        self.assertEqual(atualizado["financeiro"]["saldo_geral"], 150.0)
+
+    def test_dashboard_data_separa_saldo_do_periodo(self):
+        Pagamento.objects.create(
+            empresa=self.empresa1,
+            os=self.os_manager,
+            valor=40,
+            forma_pagamento=Pagamento.Metodo.PIX,
+            pago_em=timezone.now().date() - timedelta(days=90),
+        )
+        self.client.force_login(self.manager)
+        data = self.client.get(reverse("dashboard_data"), {"range": "30d"}).json()
+        self.assertEqual(data["financeiro"]["saldo_periodo"], 250.0)
+        self.assertEqual(data["financeiro"]["saldo_geral"], 290.0)
+
 
 class ClienteNomeUnicoPorEmpresaTests(TestCase):
     def setUp(self):
@@ -280,3 +398,180 @@ class ClienteNomeUnicoPorEmpresaTests(TestCase):
 
         self.assertFalse(form.is_valid())
         self.assertIn("nome", form.errors)
+
+
+class EmpresaLogomarcaTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def _upload(self, fmt, size=(2400, 1200)):
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, format=fmt)
+        return SimpleUploadedFile(f"logo.{fmt.lower()}", buffer.getvalue())
+
+    def test_logomarca_jpeg_grande_e_reduzida(self):
+        from PIL import Image
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            empresa = Empresa.objects.create(nome="Oficina Logo", logomarca=self._upload("JPEG"))
+            with empresa.logomarca.open("rb") as logo:
+                image = Image.open(logo)
+                self.assertEqual(image.format, "JPEG")
+                self.assertLessEqual(max(image.size), 600)
+                self.assertEqual(image.size[0], 2 * image.size[1])
+
+    def test_logomarca_url_consulta_storage_uma_vez(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            empresa = Empresa.objects.create(nome="Oficina Logo", logomarca=self._upload("PNG", (10, 10)))
+            storage = empresa.logomarca.storage
+            with mock.patch.object(storage, "exists", wraps=storage.exists) as exists:
+                self.assertTrue(empresa.logomarca_existe())
+                self.assertTrue(empresa.logomarca_url())
+            self.assertEqual(exists.call_count, 1)
+
+
+class EmpresaSaveSnapshotTests(TestCase):
+    def test_save_usa_valores_carregados_sem_select_extra(self):
+        Empresa.objects.create(nome="Oficina Snapshot", plano_periodo=Empresa.PlanoPeriodo.MENSAL)
+        empresa = Empresa.objects.get(nome="Oficina Snapshot")
+        vencimento_anterior = empresa.plano_vencimento_em
+        empresa.plano_periodo = Empresa.PlanoPeriodo.ANUAL
+        with self.assertNumQueries(1):
+            empresa.save()
+        vencimento_novo = empresa.plano_vencimento_em
+        self.assertGreater(vencimento_novo, vencimento_anterior)
+        with self.assertNumQueries(1):
+            empresa.save()
+        empresa.refresh_from_db()
+        self.assertEqual(empresa.plano_vencimento_em, vencimento_novo)
+
+
+class ReconcileEmpresaStatusTests(TestCase):
+    def test_comando_sincroniza_is_ativo(self):
+        agora = timezone.now()
+        em_dia = Empresa.objects.create(nome="Em dia", pagamento_confirmado=True)
+        vencida = Empresa.objects.create(nome="Vencida", pagamento_confirmado=True)
+        sem_pagamento = Empresa.objects.create(nome="Sem pagamento")
+        antiga = Empresa.objects.create(nome="Sem vencimento", pagamento_confirmado=True)
+        Empresa.objects.filter(pk=em_dia.pk).update(is_ativo=False)
+        Empresa.objects.filter(pk=vencida.pk).update(plano_vencimento_em=agora - timedelta(days=1), is_ativo=True)
+        Empresa.objects.filter(pk=sem_pagamento.pk).update(is_ativo=True)
+        Empresa.objects.filter(pk=antiga.pk).update(
+            plano_vencimento_em=None, plano_atualizado_em=agora - timedelta(days=31), is_ativo=True
+        )
+
+        with mock.patch("core.management.commands.reconcile_empresa_status.invalidar_dashboard") as invalidar:
+            call_command("reconcile_empresa_status", stdout=StringIO())
+        self.assertEqual(
+            {chamada.args[0] for chamada in invalidar.call_args_list},
+            {em_dia.pk, vencida.pk, sem_pagamento.pk, antiga.pk},
+        )
+
+        status = dict(Empresa.objects.values_list("nome", "is_ativo"))
+        self.assertEqual(
+            status,
+            {"Em dia": True, "Vencida": False, "Sem pagamento": False, "Sem vencimento": False},
+        )
+        for empresa in Empresa.objects.all():
+            self.assertEqual(
+                empresa.plano_vencido(),
+                Empresa.objects.filter(Empresa.plano_vencido_q(agora.date()), pk=empresa.pk).exists(),
+            )
+
+
+class SeedDemoTests(TestCase):
+    def test_rodar_de_novo_nao_duplica_dados(self):
+        call_command("seed_demo", stdout=StringIO())
+        Cliente.objects.filter(nome="CLIENTE DEMO").update(telefone="11900000000")
+        call_command("seed_demo", stdout=StringIO())
+        cliente = Cliente.objects.get(empresa__nome="Oficina Demo")
+        self.assertEqual(cliente.telefone, "11900000000")
+        self.assertEqual(OrdemServico.objects.filter(empresa=cliente.empresa).count(), 1)
+        self.assertEqual(Pagamento.objects.filter(empresa=cliente.empresa).count(), 1)
+
+
+class VeiculoFormCleanTests(TestCase):
+    def setUp(self):
+        self.empresa = Empresa.objects.create(nome="Oficina V", pagamento_confirmado=True)
+        self.user = User.objects.create_user(username="veiculo_user", password="123", empresa=self.empresa)
+        self.cliente = Cliente.objects.create(empresa=self.empresa, nome="Cliente V", telefone="1111")
+
+    def _form(self, **overrides):
+        data = {
+            "cliente": self.cliente.pk,
+            "tipo": Veiculo.Tipo.CARRO,
+            "marca": "Fiat",
+            "modelo": "uno mille",
+            "placa": "abc1d23",
+        }
+        data.update(overrides)
+        return VeiculoForm(data=data, user=self.user)
+
+    def test_normaliza_ano_modelo(self):
+        form = self._form(ano="2023.2024")
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["ano"], "2023/2024")
+        self.assertEqual(form.cleaned_data["modelo"], "Uno Mille")
+        self.assertEqual(form.cleaned_data["placa"], "ABC1D23")
+
+    def test_capitaliza_cada_palavra_do_modelo(self):
+        form = self._form(modelo="  hb20s  1.0 t-cross ", cor="VERDE musgo")
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["modelo"], "Hb20s 1.0 T-cross")
+        self.assertEqual(form.cleaned_data["cor"], "Verde Musgo")
+
+    def test_pagina_envia_mapa_de_marcas_uma_vez(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("veiculos_create"))
+        self.assertContains(response, 'id="brands-by-tipo"', count=1)
+        self.assertNotContains(response, "data-brands")
+
+    def test_rejeita_ano_incompleto(self):
+        form = self._form(ano="20.2")
+        self.assertFalse(form.is_valid())
+        self.assertIn("ano", form.errors)
+
+    def test_digits_only_fora_do_ascii(self):
+        self.assertEqual(_digits_only("79.002-140"), "79002140")
+        self.assertEqual(_digits_only("79002\u2013140"), "79002140")
+        self.assertEqual(_digits_only(None), "")
+
+
+class OrdemServicoFormVeiculosTests(TestCase):
+    def setUp(self):
+        self.empresa = Empresa.objects.create(nome="Oficina OS", pagamento_confirmado=True)
+        self.user = User.objects.create_user(username="os_user", password="123", empresa=self.empresa)
+        self.cliente = Cliente.objects.create(empresa=self.empresa, nome="Cliente OS", telefone="1111")
+        cache.clear()
+
+    def _vehicles(self):
+        form = OrdemServicoForm(user=self.user)
+        return json.loads(form.fields["veiculo"].widget.attrs["data-vehicles"])
+
+    def test_mapa_de_veiculos_reflete_alteracoes(self):
+        self.assertEqual(self._vehicles(), {})
+        veiculo = Veiculo.objects.create(
+            empresa=self.empresa,
+            cliente=self.cliente,
+            tipo=Veiculo.Tipo.CARRO,
+            placa="CCC1234",
+            marca="Marca",
+            modelo="Modelo",
+        )
+        self.assertEqual(
+            self._vehicles(), {str(self.cliente.pk): [{"id": veiculo.pk, "label": "CCC1234 - Modelo"}]}
+        )
+        veiculo.modelo = "Outro"
+        veiculo.save()
+        self.assertEqual(self._vehicles()[str(self.cliente.pk)][0]["label"], "CCC1234 - Outro")
+        veiculo.delete()
+        self.assertEqual(self._vehicles(), {})
+
+    def test_mapa_de_veiculos_reaproveitado_entre_formularios(self):
+        self._vehicles()
+        with mock.patch("core.forms._vehicles_map") as vehicles_map:
+            self.assertEqual(self._vehicles(), {})
+        vehicles_map.assert_not_called()
@@ -15,12 +15,13 @@ from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.models import Group
 from django.contrib.auth.views import LoginView
 from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from django.core.files.storage import default_storage
 from django.db import IntegrityError
-from django.db.models import Q, Sum, Case, When, Value, IntegerField, F
+from django.db.models import Q, Sum, Case, When, Value, IntegerField, F, Exists, OuterRef
 from django.db.models.functions import TruncDate, TruncMonth, TruncYear
 from django.shortcuts import get_object_or_404, redirect
 from django.http import HttpResponse, JsonResponse
@@ -72,8 +73,9 @@ from .models import (
     Usuario,
     Veiculo,
 )
+from .permissions import ROLE_MANAGER
 from .services import criar_os_log, os_queryset_for_user
-from .services.dashboard_metrics import build_dashboard_data
+from .services.dashboard_metrics import build_dashboard_data, invalidar_dashboard
 from .services.resend_email import send_email_resend
 
 
@@ -829,7 +831,9 @@ class UsuarioListView(ManagerRequiredMixin, EmpresaQuerysetMixin, ListView):
                 | Q(first_name__icontains=termo)
                 | Q(last_name__icontains=termo)
             )
-        return qs.order_by("username")
+        # Preenche o cache de Usuario.is_gerente() para a coluna de perfil.
+        gerente = Group.objects.filter(user=OuterRef("pk"), name=ROLE_MANAGER)
+        return qs.annotate(_no_grupo_gerente=Exists(gerente)).order_by("username")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1135,6 +1139,8 @@ def importar_produtos_csv(request):
         Produto.objects.bulk_create(created)
     if updated:
         Produto.objects.bulk_update(updated, update_fields)
+    # bulk_create/bulk_update não disparam post_save.
+    invalidar_dashboard(empresa.pk)
 
     messages.success(
         request,
@@ -1169,7 +1175,10 @@ class OrdemServicoListView(EmpresaQuerysetMixin, ListView):
     def get_queryset(self):
         qs = os_queryset_for_user(
             self.request.user,
-            OrdemServico.objects.select_related("cliente", "veiculo", "responsavel", "executor"),
+            # A listagem não exibe os campos de texto longo nem o anexo.
+            OrdemServico.objects.select_related("cliente", "veiculo", "responsavel", "executor").defer(
+                "problema", "diagnostico", "observacoes", "anexo"
+            ),
         )
         status = self.request.GET.get("status")
         inicio = self._parse_date(self.request.GET.get("inicio"))
@@ -1644,7 +1653,9 @@ class RelatoriosView(ManagerRequiredMixin, TemplateView):
         if not self._validar_periodo(inicio, fim):
             messages.error(self.request, "Data de início não pode ser maior que a data final.")
             inicio, fim = (timezone.now().date() - timedelta(days=30), timezone.now().date())
-        ordens = OrdemServico.objects.filter(empresa=empresa, entrada_em__gte=inicio, entrada_em__lte=fim)
+        ordens = OrdemServico.objects.filter(
+            empresa=empresa, entrada_em__gte=inicio, entrada_em__lte=fim
+        ).select_related("cliente")
         pagamentos = Pagamento.objects.filter(empresa=empresa, pago_em__gte=inicio, pago_em__lte=fim)
         despesas = Despesa.objects.filter(empresa=empresa, data__gte=inicio, data__lte=fim)
         os_por_status = {label: ordens.filter(status=value).count() for value, label in OrdemServico.Status.choices}